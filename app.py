@@ -1,5 +1,9 @@
+import os
+import sys
 import logging
+import orjson
 from flask import Flask
+from flask.json.provider import JSONProvider
 from config import Config
 from api import api_bp
 from services.data_loader import data_loader_instance
@@ -9,11 +13,24 @@ from services.data_loader import data_loader_instance
 
 
 
+# JSON provider that serializes with orjson instead of the standard library
+class OrjsonProvider(JSONProvider):
+    # serialize data to a JSON string, non-string keys are allowed like with json
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+
+    # deserialize JSON data (str or bytes)
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
 def create_app():
     # create a new Flask application instance
     app = Flask(__name__)  
     # load configuration from the Config class
     app.config.from_object(Config)  
+    # use orjson for jsonify and request parsing
+    app.json = OrjsonProvider(app)  
 
     # configure logging based on the environment (development/production)
     log_level = logging.DEBUG if app.config["DEBUG"] else logging.INFO  # set log level based on debug mode
@@ -52,9 +69,14 @@ def create_app():
 
 # check if the script is run directly
 if __name__ == '__main__':
-    # create the app instance
-    app = create_app()  
-    # log that the server is starting
-    app.logger.info("Starting Flask server.")  
-    # start the Flask server on host 0.0.0.0 and port 5000
-    app.run(host='0.0.0.0', port=5000)  
+    # the single-threaded development server only runs when explicitly requested
+    if os.environ.get("FLASK_DEV"):
+        # create the app instance
+        app = create_app()  
+        # log that the server is starting
+        app.logger.info("Starting Flask development server.")  
+        # start the Flask server on host 0.0.0.0 and port 5000
+        app.run(host='0.0.0.0', port=5000)  
+    else:
+        # point to the production server otherwise, without loading any data
+        sys.exit("Set FLASK_DEV=1 for the development server, or run: gunicorn -c gunicorn.conf.py")  
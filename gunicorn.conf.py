@@ -0,0 +1,23 @@
+import gc
+import os
+
+
+
+
+# serve the application factory from app.py
+wsgi_app = "app:create_app()"
+# listen on all interfaces, port 5000 like the development server
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:5000")
+
+# load the data once in the master, workers share it through copy-on-write
+preload_app = True
+# one worker per core, each with a few threads for concurrent requests
+workers = int(os.environ.get("GUNICORN_WORKERS", os.cpu_count() or 1))
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+
+
+# move the loaded objects out of the garbage collector's reach before forking
+def pre_fork(server, worker):
+    # gc passes would otherwise write to every object header and copy the shared pages
+    gc.freeze()
@@ -1,9 +1,15 @@
 import os
-import ijson
+import sys
 import time
-from collections import defaultdict
+import hashlib
+import numpy as np
+import orjson
+import simdjson
+from concurrent.futures import ThreadPoolExecutor
 from flask import current_app
 from services.exceptions import DataLoaderException
+from services.models import Category, Contact, Product
+from services.kernels import aggregate, lookup, rows_by_first_sale, top_per_row, unique_by_first_appearance, unique_pair_counts
 from utils.data_utils import extract_id, validate_numeric, log_data_summary
 
 
@@ -28,12 +34,13 @@ class CategoryLoadStrategy(DataLoadStrategy):
         
         try:
             # open categories JSON file for reading
-            with open(file_path, "r") as f:  
-                # parse JSON items one by one
-                for category in ijson.items(f, "item"):  
-                    # process each category
-                    self._process_category(category, data_loader)  
-            current_app.logger.info(f"Loaded {len(data_loader.categories)} categories")  
+            with open(file_path, "rb") as f:  
+                # parse the whole file at once
+                categories = orjson.loads(f.read())  
+            for category in categories:  
+                # process each category
+                self._process_category(category, data_loader)  
+            current_app.logger.info(f"Loaded {len(data_loader.category_index)} categories")  
         except Exception as e:  
             current_app.logger.error(f"Category load error: {str(e)}")  
             raise DataLoaderException(f"Category loading failed: {str(e)}", 500)  
@@ -45,12 +52,8 @@ class CategoryLoadStrategy(DataLoadStrategy):
         # set parent name if available
         parent_name = "No Parent" if isinstance(parent_info, bool) and parent_info else None  
         
-        # add category data to the data loader
-        data_loader.categories[category["id"]] = category  
-        data_loader.category_index[category["id"]] = {
-            'name': category["name"],
-            'parent': parent_name
-        }
+        # keep only the category fields the API uses
+        data_loader.category_index[category["id"]] = Category(sys.intern(category["name"]), parent_name)  
 
 
 # product data loading strategy
@@ -64,11 +67,12 @@ class ProductLoadStrategy(DataLoadStrategy):
         
         try:
             # open products JSON file for reading
-            with open(file_path, "r") as f:  
-                # parse JSON items one by one
-                for product in ijson.items(f, "item"):  
-                    # process each product
-                    self._process_product(product, data_loader)  
+            with open(file_path, "rb") as f:  
+                # parse the whole file at once
+                products = orjson.loads(f.read())  
+            for product in products:  
+                # process each product
+                self._process_product(product, data_loader)  
             current_app.logger.info(f"Loaded {len(data_loader.products)} products")  
         except Exception as e:  
             current_app.logger.error(f"Product load error: {str(e)}")  
@@ -76,16 +80,16 @@ class ProductLoadStrategy(DataLoadStrategy):
 
     # process individual product data
     def _process_product(self, product, data_loader):  
-        # add product data to the data loader
-        data_loader.products[product["id"]] = product  
         # get category info for the product
         categ_info = product.get("categ_id")  
+        category_id, category_name = None, None  
         if isinstance(categ_info, list):  
             # map product to category
-            data_loader.product_category_map[product["id"]] = {
-                'id': categ_info[0] if len(categ_info) > 0 else None,
-                'name': categ_info[1] if len(categ_info) > 1 else "Unnamed Category"
-            }
+            category_id = categ_info[0] if len(categ_info) > 0 else None  
+            # intern the name, it repeats for every product of the category
+            category_name = sys.intern(categ_info[1]) if len(categ_info) > 1 else "Unnamed Category"  
+        # keep only the product fields the API uses
+        data_loader.products[product["id"]] = Product(product.get("name"), category_id, category_name)  
 
 
 # contact data loading strategy
@@ -99,11 +103,12 @@ class ContactLoadStrategy(DataLoadStrategy):
         
         try:
             # open contacts JSON file for reading
-            with open(file_path, "r") as f:  
-                # parse JSON items one by one
-                for contact in ijson.items(f, "item"):  
-                    # process each contact
-                    self._process_contact(contact, data_loader)  
+            with open(file_path, "rb") as f:  
+                # parse the whole file at once
+                contacts = orjson.loads(f.read())  
+            for contact in contacts:  
+                # process each contact
+                self._process_contact(contact, data_loader)  
             current_app.logger.info(f"Loaded {len(data_loader.contacts)} contacts")  
         except Exception as e:  
             current_app.logger.error(f"Contact load error: {str(e)}")  
@@ -113,14 +118,14 @@ class ContactLoadStrategy(DataLoadStrategy):
     def _process_contact(self, contact, data_loader):  
         # get contact ID
         contact_id = contact["id"]  
-        # add contact to data loader
-        data_loader.contacts[contact_id] = contact  
+        # keep only the contact fields the API uses
+        data_loader.contacts[contact_id] = Contact(contact.get("name"))  
         # get country info for the contact
         country_info = contact.get("country_id")  
         
         if isinstance(country_info, list) and len(country_info) > 1:  
-            # extract country details
-            country_name = country_info[1]  
+            # extract country details, interning the name shared by many contacts
+            country_name = sys.intern(country_info[1])  
             country_code = country_info[0]  
             
             # map contact to country
@@ -148,80 +153,157 @@ class SalesLoadStrategy(DataLoadStrategy):
     def load(self, data_loader: 'DataLoader'):  
         # start the time tracking for performance
         start_time = time.time()  
-        processed = 0  # counter for processed records
+        # index the products, categories and countries the sales refer to
+        data_loader.build_indexes()  
         # get the folder path from Flask config
         data_folder = current_app.config["DATA_FOLDER"]  
         # construct the full file path
         file_path = os.path.join(data_folder, "sale_order_lines.json")  
         
         try:
-            # open sales JSON file for reading
-            with open(file_path, "r") as f:  
-                # parse JSON items one by one
-                for sale in ijson.items(f, "item"):  
-                    # process each sale if it meets the conditions
-                    if self._process_sale(sale, data_loader):  
-                        processed += 1  
+            # parse the sales file lazily, fields are only decoded when read
+            parser = simdjson.Parser()  
+            sales = parser.load(file_path)  
+            # preallocate the columns for every sale line, trimmed to the accepted ones below
+            product_ids = np.empty(len(sales), dtype=np.int64)  
+            customer_ids = np.empty(len(sales), dtype=np.int64)  
+            quantities = np.empty(len(sales), dtype=np.float64)  
+            count = 0  # number of accepted sales
+            for sale in sales:  
+                # skip sales not created in 2024, before any other field is read
+                if not sale.get("create_date", "").startswith("2024"):  
+                    continue  
+                # collect each sale if it meets the conditions
+                row = self._extract_sale(sale)  
+                if row:  
+                    product_ids[count], customer_ids[count], quantities[count] = row  
+                    count += 1  
+            data_loader.sales_processed = count  
+            # aggregate the collected columns
+            self._aggregate(data_loader, product_ids[:count], customer_ids[:count], quantities[:count])  
+            # precompute the top products and the category order
+            self._finalize(data_loader)  
             # log summary of the data loaded
             log_data_summary(data_loader)  
         except Exception as e:  
             current_app.logger.error(f"Sales processing failed: {str(e)}")  
             raise DataLoaderException(f"Sales processing error: {str(e)}", 500)  
 
-    # process individual sale data
-    def _process_sale(self, sale, data_loader):  
-        # skip sales not created in 2024
-        if not sale.get("create_date", "").startswith("2024"):  
-            return False  
-
+    # extract (product_id, customer_id, quantity) from a 2024 sale, or None if skipped
+    def _extract_sale(self, sale):  
         # extract product and customer ID
         product_id = extract_id(sale.get("product_id"))  
         customer_id = extract_id(sale.get("order_partner_id"))  
         
         if not product_id:  
-            return False  
+            return None  
 
-        # validate quantity value
-        quantity = validate_numeric(sale.get("product_uom_qty", 0))  
-        # get country data for the customer
-        country_data = data_loader.contact_country_map.get(customer_id, {})  
-        country_name = country_data.get('name', 'Unknown')  
-        
-        # get category info for the product
-        category = data_loader.product_category_map.get(product_id, {})  
-        category_id = category.get('id')  
+        # numbers go straight into the column, anything else is validated first
+        quantity = sale.get("product_uom_qty", 0)  
+        if not isinstance(quantity, (int, float)):  
+            quantity = validate_numeric(quantity)  
+
+        # 0 stands for a missing customer
+        return product_id, customer_id or 0, quantity  
+
+    # aggregate sale columns into the sales maps with group-by sums
+    def _aggregate(self, data_loader, product_ids, customer_ids, quantities):  
+        # clamp negative (and NaN) quantities to 0.0
+        quantities = np.fmax(quantities, 0.0)  
+
+        # extend the product index with products that only appear in sales
+        for product_id in np.unique(product_ids).tolist():  
+            if product_id not in data_loader.product_id_to_ix:  
+                data_loader.product_id_to_ix[product_id] = len(data_loader.product_ids)  
+                data_loader.product_ids.append(product_id)  
+        ncat, nprod = len(data_loader.category_ids), len(data_loader.product_ids)  
+
+        # map product ids to dense product and category indexes (-1 = no category)
+        product_ix = lookup(data_loader.product_id_to_ix, product_ids)  
+        product_category_ix = np.full(nprod, -1, dtype=np.int64)  
+        for product_id, product in data_loader.products.items():  
+            if product.category_id:  
+                product_category_ix[data_loader.product_id_to_ix[product_id]] = data_loader.category_id_to_ix[product.category_id]  
+        category_ix = product_category_ix[product_ix]  
 
-        if category_id:  
-            # update sales data by category
-            data_loader.category_sales[category_id] += quantity  
-            data_loader.category_product_sales[category_id][product_id] += quantity  
+        # map customer ids to dense country indexes (0 = Unknown)
+        country_ix = lookup(
+            {contact_id: data_loader.country_to_ix[country['name']] for contact_id, country in data_loader.contact_country_map.items()},
+            customer_ids,
+            default=0
+        )  
+
+        # update sales data by category
+        data_loader.category_sales, data_loader.category_product_sales, data_loader.category_product_first_sale = aggregate(
+            category_ix, product_ix, quantities, ncat, nprod
+        )  
 
         # update sales data by country
-        data_loader.country_product_sales[country_name][product_id] += quantity  
+        _, data_loader.country_product_sales, data_loader.country_product_first_sale = aggregate(
+            country_ix, product_ix, quantities, len(data_loader.country_names), nprod
+        )  
 
-        if customer_id:  
-            # add product to the customer's list
-            data_loader.client_products[customer_id].add(product_id)  
+        # count the distinct products bought by each customer, clients indexed by first purchase
+        has_customer = customer_ids != 0  
+        data_loader.client_ids, client_ix = unique_by_first_appearance(customer_ids[has_customer])  
+        data_loader.unique_products_per_client = unique_pair_counts(
+            client_ix, product_ix[has_customer], len(data_loader.client_ids)
+        )  
 
-        return True
+    # precompute lookups that only change at load time
+    def _finalize(self, data_loader):  
+        # top-selling (product index, quantity) per category and per country index
+        data_loader.category_top_product = data_loader.top_product_per_category()  
+        data_loader.country_top_product = data_loader.top_product_per_country()  
+        # (category index, total) for categories with sales, sorted by total in descending order,
+        # equal totals keep the order of their first sale
+        sold_ix = np.fromiter(data_loader.category_top_product, dtype=np.int64)  
+        sold_ix = sold_ix[np.argsort(-data_loader.category_sales[sold_ix], kind="stable")]  
+        data_loader.categories_sorted_by_sales = list(zip(sold_ix.tolist(), data_loader.category_sales[sold_ix].tolist()))  
 
 
 # main data loader class
 class DataLoader:
     # initialize data loader
     def __init__(self):  
-        # initialize dictionaries to store loaded data
-        self.categories = {}  
+        # initialize dictionaries to store loaded data, as slim records by id
         self.products = {}  
         self.contacts = {}  
         self.category_index = {}  
-        self.product_category_map = {}  
-        self.category_sales = defaultdict(float)  
-        self.category_product_sales = defaultdict(lambda: defaultdict(float))  
-        self.country_product_sales = defaultdict(lambda: defaultdict(float))  
-        self.client_products = defaultdict(set)  
+        # dense integer indexes, built once the reference data is loaded
+        self.product_ids = []  
+        self.product_id_to_ix = {}  
+        self.category_ids = []  
+        self.category_id_to_ix = {}  
+        self.country_names = []  
+        self.country_to_ix = {}  
+        # sales per category index, and per (category index, product index)
+        self.category_sales = np.zeros(0, dtype=np.float64)  
+        self.category_product_sales = np.zeros((0, 0), dtype=np.float64)  
+        self.category_product_first_sale = np.zeros((0, 0), dtype=np.int64)  
+        # sales per (country index, product index)
+        self.country_product_sales = np.zeros((0, 0), dtype=np.float64)  
+        self.country_product_first_sale = np.zeros((0, 0), dtype=np.int64)  
+        # customer ids and their number of distinct products, by client index
+        self.client_ids = np.zeros(0, dtype=np.int64)  
+        self.unique_products_per_client = np.zeros(0, dtype=np.int64)  
+        # names by category, product and client index, with each endpoint's label for ids without a record
+        self.category_name_arr = np.empty(0, dtype=object)  
+        self.top_product_name_arr = np.empty(0, dtype=object)  
+        self.product_name_arr = np.empty(0, dtype=object)  
+        self.client_name_arr = np.empty(0, dtype=object)  
+        self.sales_processed = 0  # counter for accepted sale lines
         self.contact_country_map = {}  
         self.country_code_map = {}  
+        self.category_top_product = {}  
+        self.categories_sorted_by_sales = []  
+        self.country_top_product = {}  
+        # response bodies serialized once after loading, and their shared ETag
+        self.sales_loaded = False  
+        self.most_sold_by_category_json = b"[]"  
+        self.most_sold_by_country_json = b"[]"  
+        self.top_client_json = None  
+        self.etag = ""  
         self.factory = DataLoadFactory()  # create a factory for loading strategies
 
     # method to load data based on data type
@@ -229,35 +311,174 @@ class DataLoader:
         # use the factory to get the appropriate loader and load data
         self.factory.get_loader(data_type).load(self)  
 
+    # load a data type inside an app context, used from worker threads
+    def _load_data_in_context(self, app, data_type: str):  
+        with app.app_context():  
+            self.load_data(data_type)  
+
+    # assign dense integer indexes to the loaded products, categories and countries
+    def build_indexes(self):  
+        self.product_ids = list(self.products)  
+        self.product_id_to_ix = {product_id: ix for ix, product_id in enumerate(self.product_ids)}  
+        # keep categories that products reference but the category file lacks
+        self.category_ids = list(dict.fromkeys(
+            [*self.category_index, *(p.category_id for p in self.products.values() if p.category_id)]
+        ))  
+        self.category_id_to_ix = {category_id: ix for ix, category_id in enumerate(self.category_ids)}  
+        # index 0 is reserved for sales without a known country
+        self.country_names = ['Unknown'] + [name for name in self.country_code_map if name != 'Unknown']  
+        self.country_to_ix = {name: ix for ix, name in enumerate(self.country_names)}  
+
+    # fill name arrays indexed by the dense category, product and client indexes
+    def build_name_arrays(self):  
+        self.category_name_arr = _name_array(self.category_ids, self.category_index, 'Unknown Category')  
+        # /most_sold_by_category and /most_sold_by_country label unknown products differently
+        self.top_product_name_arr = _name_array(self.product_ids, self.products, 'Unknown Product')  
+        self.product_name_arr = _name_array(self.product_ids, self.products, "unknown")  
+        self.client_name_arr = _name_array(self.client_ids.tolist(), self.contacts, "unknown")  
+
+    # top-selling (product index, quantity) for each category index with sales
+    def top_product_per_category(self):  
+        return self._top_products(self.category_product_sales, self.category_product_first_sale)  
+
+    # top-selling (product index, quantity) for each country index with sales
+    def top_product_per_country(self):  
+        return self._top_products(self.country_product_sales, self.country_product_first_sale)  
+
+    # top product of each row with sales, rows in the order of their first sale
+    def _top_products(self, sales, first_sale):  
+        top_ix, top_quantity, has_sales = top_per_row(sales, first_sale)  
+        top_ix, top_quantity, has_sales = top_ix.tolist(), top_quantity.tolist(), has_sales.tolist()  
+        return {
+            row: (top_ix[row], top_quantity[row])
+            for row in rows_by_first_sale(first_sale).tolist()
+            if has_sales[row]
+        }  
+
     # method to initialize all data
     def initialize_data(self):  
         # log the start of data initialization
         current_app.logger.info("Starting data initialization")  
-        # load data for each type (categories, products, contacts, sales)
+        # the worker threads need the app to push their own app context
+        app = current_app._get_current_object()  
+        # categories, products and contacts are independent, load them concurrently
+        with ThreadPoolExecutor(max_workers=3) as executor:  
+            futures = {
+                data_type: executor.submit(self._load_data_in_context, app, data_type)
+                for data_type in ["categories", "products", "contacts"]
+            }  
+        # check each type in order, sales are loaded last since they depend on the others
         for data_type in ["categories", "products", "contacts", "sales"]:  
             try:
-                # load the data for the specified type
-                self.load_data(data_type)  
+                if data_type in futures:  
+                    # re-raise any error from the worker thread
+                    futures[data_type].result()  
+                else:
+                    # load the data for the specified type
+                    self.load_data(data_type)  
             except DataLoaderException as e:  
                 # log error if loading fails
                 current_app.logger.error(f"Failed to load {data_type}: {str(e)}")  
                 raise  
-        # log data summary after loading all data
-        log_data_summary(self)  
+        # index the names used by the responses, then serialize them once
+        self.build_name_arrays()  
+        self._build_payloads()  
+        # the aggregates never change after this point
+        self._freeze_arrays()  
+
+    # mark the sales arrays read-only, so forked workers keep sharing their pages
+    def _freeze_arrays(self):  
+        for array in (
+            self.category_sales, self.category_product_sales, self.category_product_first_sale,
+            self.country_product_sales, self.country_product_first_sale,
+            self.client_ids, self.unique_products_per_client,
+            self.category_name_arr, self.top_product_name_arr, self.product_name_arr, self.client_name_arr
+        ):  
+            array.setflags(write=False)  
+
+    # serialize each endpoint's response, the data never changes after loading
+    def _build_payloads(self):  
+        # loaded once some category has a sale, even if every quantity is 0
+        self.sales_loaded = bool(self.category_top_product)  
+        self.most_sold_by_category_json = orjson.dumps(self._compute_most_sold_by_category())  
+        self.most_sold_by_country_json = orjson.dumps(self._compute_most_sold_by_country())  
+        top_client = self._compute_top_client()  
+        self.top_client_json = orjson.dumps(top_client) if top_client else None  
+        # one tag for the whole load, so clients can revalidate with If-None-Match
+        digest = hashlib.blake2b(digest_size=16)  
+        for payload in (self.most_sold_by_category_json, self.most_sold_by_country_json, self.top_client_json or b""):  
+            digest.update(payload)  
+        self.etag = digest.hexdigest()  
+
+    # top-selling product per category, in the presorted category order
+    def _compute_most_sold_by_category(self):  
+        results = []
+        for cat_ix, category_total in self.categories_sorted_by_sales:  
+            product_ix, quantity = self.category_top_product[cat_ix]  
+            results.append({
+                "category_id": self.category_ids[cat_ix],
+                "category_name": self.category_name_arr[cat_ix],
+                "top_product": self.top_product_name_arr[product_ix],
+                "total_quantity": quantity,
+                "category_total": category_total
+            })  
+        return results  
+
+    # top-selling product per country
+    def _compute_most_sold_by_country(self):  
+        return [
+            {
+                "country": self.country_names[country_ix],
+                "product_id": self.product_ids[product_ix],
+                "product_name": self.product_name_arr[product_ix],
+                "total_quantity": quantity,
+                "country_code": self.country_code_map.get(self.country_names[country_ix], "XX")
+            }
+            for country_ix, (product_ix, quantity) in self.country_top_product.items()
+        ]  
+
+    # client who bought the most unique products, or None without client data
+    def _compute_top_client(self):  
+        if not self.unique_products_per_client.size:  
+            return None  
+        top_ix = int(self.unique_products_per_client.argmax())  
+        client_id = int(self.client_ids[top_ix])  
+        current_app.logger.info(f"Top client determined: {client_id}")  
+        return {
+            "client_id": client_id,
+            "client_name": self.client_name_arr[top_ix],
+            "unique_products": int(self.unique_products_per_client[top_ix])
+        }  
+
+
+# names of the records for a list of ids, as an object array (default for ids without a record)
+def _name_array(ids, records, default):  
+    names = np.empty(len(ids), dtype=object)  
+    for ix, record_id in enumerate(ids):  
+        record = records.get(record_id)  
+        # a stored name is kept as-is, even when it is falsy
+        names[ix] = default if record is None else record.name  
+    return names  
+
+
+# stateless loader strategies, shared by every lookup
+_LOADERS = {
+    "categories": CategoryLoadStrategy(),  
+    "products": ProductLoadStrategy(),  
+    "contacts": ContactLoadStrategy(),  
+    "sales": SalesLoadStrategy()  
+}  
 
 
 # factory class to get the appropriate loader strategy
 class DataLoadFactory:
     # method to get the correct loader based on data type
     def get_loader(self, data_type: str) -> DataLoadStrategy:  
-        loaders = {
-            "categories": CategoryLoadStrategy(),  
-            "products": ProductLoadStrategy(),  
-            "contacts": ContactLoadStrategy(),  
-            "sales": SalesLoadStrategy()  
-        }  
-        # return the loader for the specified data type
-        return loaders.get(data_type, ValueError(f"Unknown data type: {data_type}"))  
+        try:
+            # return the loader for the specified data type
+            return _LOADERS[data_type]  
+        except KeyError:  
+            raise ValueError(f"Unknown data type: {data_type}") from None  
 
 
 # create an instance of the data loader
@@ -0,0 +1,73 @@
+import numpy as np
+
+
+
+
+# sum quantities per row and per (row, product) cell in one pass
+def aggregate(row_ix, product_ix, quantities, nrows, nprod):  
+    """Returns the row totals, the row x product sales matrix and the first sale of each cell (-1 if unsold)."""  
+
+    # rows without an index (-1) are left out of the sums
+    has_row = row_ix >= 0  
+    row_ix, product_ix, quantities = row_ix[has_row], product_ix[has_row], quantities[has_row]  
+    row_sales = np.bincount(row_ix, weights=quantities, minlength=nrows)  
+    cells = row_ix * nprod + product_ix  
+    sales = np.bincount(cells, weights=quantities, minlength=nrows * nprod).reshape(nrows, nprod)  
+    # position of the first sale of each cell, used to break ties like a sequential scan
+    first_sale = np.full(nrows * nprod, -1, dtype=np.int64)  
+    sold_cells, first = np.unique(cells, return_index=True)  
+    first_sale[sold_cells] = first  
+    return row_sales, sales, first_sale.reshape(nrows, nprod)  
+
+# find the top-selling product of each row of a sales matrix
+def top_per_row(sales, first_sale):  
+    """Returns the top product index and quantity per row, and which rows had sales."""  
+
+    nrows = sales.shape[0]  
+    sold = first_sale >= 0  
+    if sales.shape[1] == 0:  
+        return np.zeros(nrows, dtype=np.int64), np.zeros(nrows), np.zeros(nrows, dtype=bool)  
+    # only products actually sold in a row can be its top product
+    best = np.where(sold, sales, -np.inf).max(axis=1, keepdims=True)  
+    # among tied best sellers, the one sold first wins
+    top_ix = np.where(sold & (sales == best), first_sale, np.iinfo(np.int64).max).argmin(axis=1)  
+    return top_ix, sales[np.arange(nrows), top_ix], sold.any(axis=1)  
+
+# order the rows of a sales matrix by their first sale, rows without sales last
+def rows_by_first_sale(first_sale):  
+    """Returns row indexes sorted by the position of each row's first sale."""  
+
+    row_first = np.where(first_sale >= 0, first_sale, np.iinfo(np.int64).max).min(axis=1, initial=np.iinfo(np.int64).max)  
+    return np.argsort(row_first, kind="stable")  
+
+# dense ids for integer keys, numbered in order of first appearance
+def unique_by_first_appearance(keys):  
+    """Returns the distinct keys in order of first appearance and the dense id of each key."""  
+
+    uniq, first, inverse = np.unique(keys, return_index=True, return_inverse=True)  
+    order = np.argsort(first, kind="stable")  
+    rank = np.empty_like(order)  
+    rank[order] = np.arange(len(order))  
+    return uniq[order], rank[inverse.ravel()]  
+
+# count the distinct products of each row from (row, product) pairs
+def unique_pair_counts(row_ix, product_ix, nrows):  
+    """Packs each pair into one uint64, dedups them and counts the pairs left per row."""  
+
+    pairs = (row_ix.astype(np.uint64) << np.uint64(32)) | product_ix.astype(np.uint64)  
+    unique_rows = (np.unique(pairs) >> np.uint64(32)).astype(np.int64)  
+    return np.bincount(unique_rows, minlength=nrows)  
+
+# map integer keys through a dict with a binary search over its sorted keys, unknown keys get the default
+def lookup(mapping, keys, default=-1):  
+    """Vectorized dict lookup for integer keys."""  
+
+    if not mapping:  
+        return np.full(len(keys), default, dtype=np.int64)  
+    table_keys = np.fromiter(mapping.keys(), dtype=np.int64, count=len(mapping))  
+    table_values = np.fromiter(mapping.values(), dtype=np.int64, count=len(mapping))  
+    order = np.argsort(table_keys)  
+    table_keys, table_values = table_keys[order], table_values[order]  
+    # memory scales with the number of mapped keys, not with the id values
+    pos = np.minimum(np.searchsorted(table_keys, keys), len(table_keys) - 1)  
+    return np.where(table_keys[pos] == keys, table_values[pos], default)  
@@ -0,0 +1,31 @@
+# slim category record, only the fields the API uses
+class Category:
+    """category name and parent, stored without the raw JSON fields."""
+
+    __slots__ = ("name", "parent")
+
+    def __init__(self, name: str, parent: str = None):
+        self.name = name  # category name
+        self.parent = parent  # parent name, if any
+
+
+# slim product record, only the fields the API uses
+class Product:
+    """product name and category, stored without the raw JSON fields."""
+
+    __slots__ = ("name", "category_id", "category_name")
+
+    def __init__(self, name: str, category_id: int = None, category_name: str = None):
+        self.name = name  # product name
+        self.category_id = category_id  # id of the product's category, if any
+        self.category_name = category_name  # name of the product's category, if any
+
+
+# slim contact record, only the fields the API uses
+class Contact:
+    """contact name, stored without the raw JSON fields."""
+
+    __slots__ = ("name",)
+
+    def __init__(self, name: str):
+        self.name = name  # contact name
@@ -0,0 +1,91 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from app import create_app
+from config import Config
+
+
+# responses of the three endpoints on the bundled data, recorded before the NumPy aggregation
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline_responses.json")
+
+
+class EndpointBaselineTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # create_app logs to app.log in the working directory, keep it out of the tree
+        cls._cwd = os.getcwd()
+        cls._tmp = tempfile.TemporaryDirectory()
+        os.chdir(cls._tmp.name)
+        cls.client = create_app().test_client()
+        with open(BASELINE_FILE, encoding="utf-8") as f:
+            cls.baseline = json.load(f)
+
+    @classmethod
+    def tearDownClass(cls):
+        os.chdir(cls._cwd)
+        cls._tmp.cleanup()
+
+    def test_matches_baseline(self):
+        for endpoint, expected in self.baseline.items():
+            with self.subTest(endpoint=endpoint):
+                response = self.client.get(f"/api/{endpoint}")
+                self.assertEqual(response.status_code, expected["status"])
+                # exact comparison, row order and tie winners included
+                self.assertEqual(response.get_json(), expected["body"])
+
+    def test_matching_etag_returns_not_modified(self):
+        etag = self.client.get("/api/most_sold_by_category").headers["ETag"]
+        response = self.client.get("/api/most_sold_by_category", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b"")
+
+
+class TopClientTieTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls._cwd = os.getcwd()
+        cls._tmp = tempfile.TemporaryDirectory()
+        os.chdir(cls._tmp.name)
+        # clients 9 and 5 both buy products 10 and 11, client 9 buys first
+        fixture = {
+            "categories.json": [{"id": 1, "name": "All", "parent_id": False}],
+            "products.json": [
+                {"id": product_id, "categ_id": [1, "All"], "name": f"Product {product_id}"} for product_id in (10, 11)
+            ],
+            "contacts.json": [
+                {"id": client_id, "name": f"Client {client_id}", "country_id": [1, "Spain"]} for client_id in (5, 9)
+            ],
+            "sale_order_lines.json": [
+                {
+                    "id": line_id,
+                    "product_id": [product_id, f"Product {product_id}"],
+                    "product_uom_qty": 1.0,
+                    "create_date": "2024-05-01 10:00:00",
+                    "order_partner_id": [client_id, f"Client {client_id}"],
+                }
+                for line_id, (client_id, product_id) in enumerate([(9, 10), (9, 11), (5, 10), (5, 11)])
+            ],
+        }
+        for name, records in fixture.items():
+            with open(name, "w", encoding="utf-8") as f:
+                json.dump(records, f)
+        with mock.patch.object(Config, "DATA_FOLDER", cls._tmp.name):
+            cls.client = create_app().test_client()
+
+    @classmethod
+    def tearDownClass(cls):
+        os.chdir(cls._cwd)
+        cls._tmp.cleanup()
+
+    def test_first_buyer_wins_tie(self):
+        response = self.client.get("/api/top_client")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["client_id"], 9)
+        self.assertEqual(response.get_json()["unique_products"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,6 @@
 import os
-import ijson
 import time
+import simdjson
 from flask import current_app
 
 
@@ -12,8 +12,8 @@ def extract_id(id_field):
     # docstring explaining the function's purpose
     """Extracts the ID from a field that may be a list."""  
     
-    # check if the field is a list and has elements
-    if isinstance(id_field, list) and len(id_field) > 0:  
+    # check if the field is a list (or a lazy simdjson array) and has elements
+    if isinstance(id_field, (list, simdjson.Array)) and len(id_field) > 0:  
         return id_field[0]  # return the first element if valid
     return None  # return None if not a valid list
 
@@ -38,10 +38,10 @@ def log_data_summary(data_loader):
     # create a summary string with the counts of categories, products, contacts, and sales
     summary = (  
         f"Data initialization completed\n"  
-        f"- Categories: {len(data_loader.categories)}\n"  
+        f"- Categories: {len(data_loader.category_index)}\n"  
         f"- Products: {len(data_loader.products)}\n"  
         f"- Contacts: {len(data_loader.contacts)}\n"  
-        f"- Sales: {sum(len(v) for v in data_loader.country_product_sales.values())}"  
+        f"- Sales: {data_loader.sales_processed}"  
     )  
     
     # log the summary to the application logger